@@ -0,0 +1,112 @@
+"""
+Benchmark: inline Proposal.raw_response vs the compressed ProposalContent table.
+
+Builds two throwaway SQLite databases with the same proposals and reports
+  - on-disk size of the proposal table (and the content table, for the new layout)
+  - peak Python memory of the list_proposals_for_rfp query + serialization
+
+    python bench_proposal_storage.py [num_proposals]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import text
+from sqlmodel import SQLModel, Field, Session, create_engine, select
+from models import RFP, Vendor, Proposal, ProposalContent
+from compression import DEFAULT_CODEC
+
+class LegacyProposal(SQLModel, table=True):
+    """The pre-migration Proposal layout, with the body stored inline."""
+    __tablename__ = "legacy_proposal"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    rfp_id: int = Field(index=True)
+    vendor_id: int
+    received_at: datetime = Field(default_factory=datetime.utcnow)
+    raw_response: str
+    extracted_data: Optional[str] = None
+    ai_score: Optional[int] = None
+    ai_rationale: Optional[str] = None
+
+NUM_RFPS = 20
+WORDS = (
+    "laptop monitor delivery warranty price unit total quote support onsite "
+    "shipping invoice payment terms net days model specification RAM SSD "
+    "regards team procurement availability discount bulk order confirm"
+).split()
+
+def make_bodies(n: int) -> list[str]:
+    rng = random.Random(42)
+    # Vendor replies quote the original RFP email, so bodies share a lot of text
+    quoted_rfp = "\n".join("> " + " ".join(rng.choices(WORDS, k=14)) for _ in range(60))
+    bodies = []
+    for i in range(n):
+        if bodies and rng.random() < 0.1:
+            # Re-sent / forwarded identical replies
+            bodies.append(rng.choice(bodies))
+            continue
+        reply = "\n".join(" ".join(rng.choices(WORDS, k=16)) for _ in range(rng.randint(10, 40)))
+        bodies.append(f"Hello,\n\n{reply}\n\nTotal: ${rng.randint(1000, 90000)}\n\nOn Mon, Procurement wrote:\n{quoted_rfp}\n")
+    return bodies
+
+def table_bytes(session: Session, table: str) -> int:
+    return session.execute(text("SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name = :name"), {"name": table}).scalar_one()
+
+def measure_list(engine, model) -> tuple[int, float]:
+    """Peak traced memory and wall time of the list endpoint's query + JSON-able dump."""
+    with Session(engine) as session:
+        tracemalloc.start()
+        start = time.perf_counter()
+        for rfp_id in range(1, NUM_RFPS + 1):
+            rows = session.exec(select(model).where(model.rfp_id == rfp_id)).all()
+            [row.model_dump() for row in rows]
+            session.expunge_all()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak, elapsed
+
+def run(n: int):
+    bodies = make_bodies(n)
+    raw_total = sum(len(b.encode("utf-8")) for b in bodies)
+    print(f"{n} proposals, {raw_total / 1024 / 1024:.1f} MiB of raw bodies, codec={DEFAULT_CODEC}\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = create_engine(f"sqlite:///{os.path.join(tmp, 'legacy.db')}")
+        SQLModel.metadata.create_all(legacy, tables=[LegacyProposal.__table__])
+        with Session(legacy) as session:
+            for i, body in enumerate(bodies):
+                session.add(LegacyProposal(rfp_id=i % NUM_RFPS + 1, vendor_id=i + 1, raw_response=body, ai_score=50))
+            session.commit()
+            legacy_size = table_bytes(session, "legacy_proposal")
+
+        new = create_engine(f"sqlite:///{os.path.join(tmp, 'new.db')}")
+        SQLModel.metadata.create_all(new, tables=[t.__table__ for t in (RFP, Vendor, ProposalContent, Proposal)])
+        with Session(new) as session:
+            by_hash: dict[str, ProposalContent] = {}
+            for i, body in enumerate(bodies):
+                content = ProposalContent.from_text(body)
+                content = by_hash.setdefault(content.content_hash, content)
+                session.add(Proposal(rfp_id=i % NUM_RFPS + 1, vendor_id=i + 1, content=content, ai_score=50))
+            session.commit()
+            proposal_size = table_bytes(session, "proposal")
+            content_size = table_bytes(session, "proposalcontent")
+            stored = len(by_hash)
+
+        legacy_peak, legacy_time = measure_list(legacy, LegacyProposal)
+        new_peak, new_time = measure_list(new, Proposal)
+
+    print(f"{'':28}{'inline':>14}{'compressed':>14}")
+    print(f"{'proposal table':28}{legacy_size / 1024:>12.0f}KB{proposal_size / 1024:>12.0f}KB")
+    print(f"{'content table':28}{'-':>14}{content_size / 1024:>12.0f}KB  ({stored} unique bodies)")
+    print(f"{'total':28}{legacy_size / 1024:>12.0f}KB{(proposal_size + content_size) / 1024:>12.0f}KB")
+    print(f"{'list endpoint peak memory':28}{legacy_peak / 1024:>12.0f}KB{new_peak / 1024:>12.0f}KB")
+    print(f"{'list endpoint time':28}{legacy_time * 1000:>12.1f}ms{new_time * 1000:>12.1f}ms")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
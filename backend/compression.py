@@ -0,0 +1,37 @@
+import hashlib
+import zlib
+
+# zstd gives a better ratio/speed trade-off on email text; fall back to zlib
+# (stdlib) so the app still runs when the optional wheel is not installed.
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODEC_ZSTD = "zstd"
+CODEC_ZLIB = "zlib"
+
+DEFAULT_CODEC = CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the uncompressed UTF-8 text, used to deduplicate bodies."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def compress_text(text: str, codec: str = DEFAULT_CODEC) -> bytes:
+    raw = text.encode("utf-8")
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed; cannot compress with zstd")
+        return zstandard.ZstdCompressor(level=9).compress(raw)
+    if codec == CODEC_ZLIB:
+        return zlib.compress(raw, 9)
+    raise ValueError(f"Unknown compression codec: {codec}")
+
+def decompress_text(data: bytes, codec: str) -> str:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed; cannot decompress zstd content")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown compression codec: {codec}")
@@ -7,12 +7,23 @@ class Settings(BaseSettings):
     
     # Google Gemini AI
     GOOGLE_API_KEY: str
+    AI_MAX_CONNECTIONS: int = 200 # Shared HTTP connection pool for all Gemini calls
+    AI_REQUEST_TIMEOUT_S: float = 120.0
+    AI_USE_SYNC_CLIENT: bool = False # Use the blocking SDK client on a dedicated executor instead of client.aio
+    AI_SYNC_WORKERS: int = 16 # Size of that executor
     
     # Email Settings
     EMAIL_ADDRESS: str
     EMAIL_PASSWORD: str
     IMAP_SERVER: str = "imap.gmail.com"
     SMTP_SERVER: str = "smtp.gmail.com"
+
+    # Request Profiling (off unless PROFILING_TOKEN is set)
+    PROFILING_TOKEN: Optional[str] = None # Enables profiling and the X-Profile: <token> header trigger, and guards /admin/profiles
+    PROFILING_SAMPLE_RATE: float = 0.0 # Fraction of requests to profile, e.g. 0.01 (requires PROFILING_TOKEN)
+    PROFILING_SLOW_REQUEST_MS: Optional[float] = None # Keep a profile for any request slower than this (requires PROFILING_TOKEN)
+    PROFILING_MAX_PROFILES: int = 50 # Size of the in-memory ring buffer
+    PROFILING_INTERVAL_MS: float = 5.0 # Stack sampling interval
     
     # Pydantic Settings configuration
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
@@ -4,8 +4,10 @@ from dotenv import load_dotenv
 import os
 
 from contextlib import asynccontextmanager
-from database import create_db_and_tables
+from database import create_db_and_tables, engine
+from services.ai_service import ai_service
 from routers import rfps, vendors, proposals
+import profiling
 import logging
 
 # Configure Logging
@@ -21,6 +23,7 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     create_db_and_tables()
     yield
+    await ai_service.aclose()
 
 app = FastAPI(title="Aerchain RFP System", lifespan=lifespan)
 app.include_router(rfps.router)
@@ -41,6 +44,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in request profiling; does nothing unless a PROFILING_* trigger is configured
+profiling.install(app, engine)
+
 @app.get("/health")
 def health_check():
     return {"status": "ok", "message": "Aerchain RFP Backend is running"}
@@ -0,0 +1,58 @@
+"""
+One-off migration: move Proposal.raw_response into the compressed
+ProposalContent table and point each proposal at its body via content_id.
+
+Safe to re-run; does nothing once the raw_response column is gone.
+
+    python migrate_proposal_content.py
+"""
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel, Session
+from database import engine
+from models import ProposalContent
+from services.content_store import content_store
+
+BATCH_SIZE = 500
+
+def migrate():
+    # Creates the proposalcontent table (existing tables are left untouched)
+    SQLModel.metadata.create_all(engine)
+
+    columns = {c["name"] for c in inspect(engine).get_columns("proposal")}
+    if "raw_response" not in columns:
+        print("proposal.raw_response already migrated, nothing to do.")
+        return
+
+    with engine.begin() as conn:
+        if "content_id" not in columns:
+            conn.execute(text("ALTER TABLE proposal ADD COLUMN content_id INTEGER REFERENCES proposalcontent(id)"))
+
+    moved = 0
+    with Session(engine) as session:
+        while True:
+            rows = session.execute(
+                text("SELECT id, raw_response FROM proposal WHERE content_id IS NULL LIMIT :limit"),
+                {"limit": BATCH_SIZE},
+            ).all()
+            if not rows:
+                break
+            for proposal_id, raw_response in rows:
+                content = content_store.get_or_create(session, raw_response or "")
+                session.execute(
+                    text("UPDATE proposal SET content_id = :content_id WHERE id = :id"),
+                    {"content_id": content.id, "id": proposal_id},
+                )
+            session.commit()
+            moved += len(rows)
+            print(f"Migrated {moved} proposals...")
+
+    with engine.begin() as conn:
+        # Requires PostgreSQL or SQLite >= 3.35
+        conn.execute(text("ALTER TABLE proposal DROP COLUMN raw_response"))
+
+    with Session(engine) as session:
+        stored = session.execute(text("SELECT COUNT(*) FROM proposalcontent")).scalar_one()
+    print(f"Done: {moved} proposals now reference {stored} stored bodies ({ProposalContent.__tablename__}).")
+
+if __name__ == "__main__":
+    migrate()
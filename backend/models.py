@@ -1,7 +1,9 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Column, LargeBinary
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
+from compression import DEFAULT_CODEC, compress_text, decompress_text, content_hash
 
 class RFPStatus(str, Enum):
     DRAFT = "draft"
@@ -38,16 +40,47 @@ class RFP(SQLModel, table=True):
     vendors: List[Vendor] = Relationship(back_populates="rfps", link_model=VendorRFPLink)
     proposals: List["Proposal"] = Relationship(back_populates="rfp")
 
+class ProposalContent(SQLModel, table=True):
+    """
+    Compressed, content-addressed storage for large text blobs (raw email bodies,
+    attachment text). Kept out of the Proposal row so listing proposals does not
+    drag the full bodies through the DB and ORM.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    content_hash: str = Field(unique=True, index=True) # SHA-256 of the uncompressed text
+    codec: str = DEFAULT_CODEC
+    size: int # Uncompressed size in bytes
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+    @classmethod
+    def from_text(cls, text: str) -> "ProposalContent":
+        return cls(
+            content_hash=content_hash(text),
+            codec=DEFAULT_CODEC,
+            size=len(text.encode("utf-8")),
+            data=compress_text(text),
+        )
+
+    @property
+    def text(self) -> str:
+        return decompress_text(self.data, self.codec)
+
 class Proposal(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     rfp_id: int = Field(foreign_key="rfp.id")
     vendor_id: int = Field(foreign_key="vendor.id")
     received_at: datetime = Field(default_factory=datetime.utcnow)
     
-    raw_response: str # The raw email body
+    content_id: Optional[int] = Field(default=None, foreign_key="proposalcontent.id") # The raw email body, see raw_response
     extracted_data: Optional[str] = None # JSON string of AI extracted details (price, timeline, etc)
     ai_score: Optional[int] = None
     ai_rationale: Optional[str] = None
     
     rfp: RFP = Relationship(back_populates="proposals")
     vendor: Vendor = Relationship(back_populates="proposals")
+    # Lazy: the body is only fetched when raw_response is accessed
+    content: Optional[ProposalContent] = Relationship(sa_relationship_kwargs={"lazy": "select"})
+
+    @property
+    def raw_response(self) -> str:
+        return self.content.text if self.content else ""
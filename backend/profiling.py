@@ -0,0 +1,320 @@
+"""
+Opt-in request profiling.
+
+A request is profiled when one of these triggers fires:
+  - manual:  header `X-Profile: <PROFILING_TOKEN>` (header only: query strings
+             end up in access logs, browser history and Referer headers)
+  - sampled: random fraction PROFILING_SAMPLE_RATE of requests
+  - slow:    any request exceeding PROFILING_SLOW_REQUEST_MS (sampling starts
+             once the threshold is crossed, so the profile covers the slow tail)
+
+A profile holds statistical stack samples (folded, flamegraph-compatible),
+every SQL statement with its duration, and timings of service calls
+decorated with @traced (AIService, EmailService, vendor import). The last PROFILING_MAX_PROFILES are kept in memory, see routers/admin.py.
+
+PROFILING_TOKEN is required: it also guards the admin endpoints, so without
+it nothing is installed (no middleware, no SQL listeners, no sampler thread,
+no admin routes) and @traced returns the function unchanged.
+"""
+from pydantic import BaseModel, PrivateAttr
+from typing import Dict, List, Optional
+from datetime import datetime
+from collections import deque
+from contextvars import ContextVar
+from config import settings
+import asyncio
+import functools
+import itertools
+import logging
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+ADMIN_PATH_PREFIX = "/admin/profiles" # Never profiled, so viewing profiles doesn't evict them
+MAX_SQL_STATEMENT_LENGTH = 500
+MAX_SQL_STATEMENTS = 1000
+
+# Profiles expose SQL text and stacks, so never capture them without a token
+# to protect the admin endpoints
+profiling_enabled = bool(settings.PROFILING_TOKEN)
+
+class TimedCall(BaseModel):
+    name: str
+    started_ms: float # Offset from the start of the request
+    duration_ms: float
+    error: Optional[str] = None
+
+class RequestProfile(BaseModel):
+    id: int
+    method: str
+    path: str
+    trigger: str # manual | sampled | slow
+    started_at: datetime
+    status_code: Optional[int] = None
+    duration_ms: Optional[float] = None
+    samples: int = 0
+    stacks: Dict[str, int] = {} # Folded stack -> sample count
+    sql: List[TimedCall] = []
+    calls: List[TimedCall] = [] # AIService / EmailService / vendor import
+
+    _start: float = PrivateAttr(default=0.0)
+    _sample_from: float = PrivateAttr(default=0.0)
+    # Threads this request has run on: the event loop thread, plus any
+    # threadpool worker seen executing its SQL or service calls
+    _threads: set = PrivateAttr(default_factory=set)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    def folded(self) -> str:
+        """Brendan Gregg's folded format, accepted by flamegraph.pl and speedscope."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.items())
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+_profile_ids = itertools.count(1)
+
+class ProfileStore:
+    """Bounded ring buffer of finished profiles, newest last."""
+    def __init__(self, max_profiles: int):
+        self._profiles: deque[RequestProfile] = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[RequestProfile]:
+        with self._lock:
+            return list(self._profiles)
+
+    def get(self, profile_id: int) -> Optional[RequestProfile]:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+profile_store = ProfileStore(settings.PROFILING_MAX_PROFILES)
+
+# Innermost frames of threads that are blocked rather than working: idle
+# threadpool workers and the event loop waiting for I/O
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+class StackSampler(threading.Thread):
+    """
+    One background thread for all in-flight profiles. It sleeps on an event
+    while nothing is being profiled, otherwise grabs thread stacks each
+    interval and adds to each due profile only the stacks of the threads that
+    request runs on. Idle/waiting stacks are dropped. The event loop thread is
+    shared, so async requests profiled concurrently can still see each other.
+    """
+    def __init__(self, interval_ms: float):
+        super().__init__(name="profiling-sampler", daemon=True)
+        self._interval = interval_ms / 1000
+        self._active: Dict[int, RequestProfile] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._active[profile.id] = profile
+            self._wake.set()
+
+    def remove(self, profile: RequestProfile):
+        # Taken under the lock so no sample lands after the profile is stored
+        with self._lock:
+            self._active.pop(profile.id, None)
+
+    def run(self):
+        own_ident = threading.get_ident()
+        while True:
+            self._wake.wait()
+            time.sleep(self._interval)
+            with self._lock:
+                if not self._active:
+                    self._wake.clear()
+                    continue
+                now = time.perf_counter()
+                if not any(now >= p._sample_from for p in self._active.values()):
+                    continue
+
+            names = {t.ident: t.name for t in threading.enumerate()}
+            stacks: Dict[int, str] = {}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident or _is_idle(frame):
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread-{ident}"))
+                stacks[ident] = ";".join(reversed(labels))
+
+            with self._lock:
+                for profile in self._active.values():
+                    if now < profile._sample_from:
+                        continue
+                    profile.samples += 1
+                    for ident in tuple(profile._threads):
+                        stack = stacks.get(ident)
+                        if stack:
+                            profile.stacks[stack] = profile.stacks.get(stack, 0) + 1
+
+_sampler: Optional[StackSampler] = None
+
+def _choose_trigger(request) -> Optional[str]:
+    if request.url.path.startswith(ADMIN_PATH_PREFIX):
+        return None
+    header = request.headers.get(PROFILE_HEADER)
+    if header and secrets.compare_digest(header, settings.PROFILING_TOKEN):
+        return "manual"
+    if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+        return "sampled"
+    if settings.PROFILING_SLOW_REQUEST_MS:
+        return "slow"
+    return None
+
+async def profiling_middleware(request, call_next):
+    trigger = _choose_trigger(request)
+    if trigger is None:
+        return await call_next(request)
+
+    profile = RequestProfile(
+        id=next(_profile_ids),
+        method=request.method,
+        path=request.url.path,
+        trigger=trigger,
+        started_at=datetime.utcnow(),
+    )
+    profile._start = time.perf_counter()
+    profile._threads.add(threading.get_ident())
+    if trigger == "slow":
+        profile._sample_from = profile._start + settings.PROFILING_SLOW_REQUEST_MS / 1000
+    else:
+        profile._sample_from = profile._start
+
+    token = _current_profile.set(profile)
+    _sampler.add(profile)
+    try:
+        response = await call_next(request)
+        profile.status_code = response.status_code
+        return response
+    finally:
+        _sampler.remove(profile)
+        _current_profile.reset(token)
+        profile.duration_ms = profile.elapsed_ms()
+        if trigger != "slow" or profile.duration_ms >= settings.PROFILING_SLOW_REQUEST_MS:
+            profile_store.add(profile)
+            logger.info(f"Stored {trigger} profile {profile.id} for {profile.method} {profile.path} ({profile.duration_ms:.0f}ms)")
+
+# The start time lives on the per-statement execution context, so a statement
+# that raises (and never reaches after_cursor_execute) leaves nothing behind
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile._threads.add(threading.get_ident()) # Sync endpoints run on a threadpool worker
+        context._profiling_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    start = getattr(context, "_profiling_start", None)
+    if profile is None or start is None:
+        return
+    if len(profile.sql) < MAX_SQL_STATEMENTS:
+        profile.sql.append(TimedCall(
+            name=statement[:MAX_SQL_STATEMENT_LENGTH],
+            started_ms=(start - profile._start) * 1000,
+            duration_ms=(time.perf_counter() - start) * 1000,
+        ))
+
+def traced(name: str):
+    """
+    Records the duration of a service call (async or sync) in the current
+    request's profile, and the thread it ran on so its stacks are sampled.
+    """
+    def decorator(func):
+        if not profiling_enabled:
+            return func
+
+        def record(profile: RequestProfile, start: float, error: Optional[str]):
+            profile.calls.append(TimedCall(
+                name=name,
+                started_ms=(start - profile._start) * 1000,
+                duration_ms=(time.perf_counter() - start) * 1000,
+                error=error,
+            ))
+
+        if not asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            def sync_wrapper(*args, **kwargs):
+                profile = _current_profile.get()
+                if profile is None:
+                    return func(*args, **kwargs)
+                profile._threads.add(threading.get_ident())
+                start = time.perf_counter()
+                error = None
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    error = str(e)
+                    raise
+                finally:
+                    record(profile, start, error)
+            return sync_wrapper
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            profile = _current_profile.get()
+            if profile is None:
+                return await func(*args, **kwargs)
+            profile._threads.add(threading.get_ident())
+            start = time.perf_counter()
+            error = None
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                record(profile, start, error)
+        return wrapper
+    return decorator
+
+def install(app, engine):
+    """Wires profiling into the app if PROFILING_TOKEN is configured; otherwise a no-op."""
+    global _sampler
+    if not profiling_enabled:
+        if settings.PROFILING_SAMPLE_RATE > 0 or settings.PROFILING_SLOW_REQUEST_MS:
+            logger.warning("PROFILING_SAMPLE_RATE / PROFILING_SLOW_REQUEST_MS are ignored: set PROFILING_TOKEN to enable profiling")
+        return
+
+    from sqlalchemy import event
+    from routers import admin
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    _sampler = StackSampler(settings.PROFILING_INTERVAL_MS)
+    _sampler.start()
+
+    app.middleware("http")(profiling_middleware)
+    app.include_router(admin.router)
+    logger.info(
+        f"Request profiling enabled (sample rate {settings.PROFILING_SAMPLE_RATE}, "
+        f"slow threshold {settings.PROFILING_SLOW_REQUEST_MS}ms)"
+    )
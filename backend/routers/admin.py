@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+import secrets
+from config import settings
+from profiling import profile_store, RequestProfile, ADMIN_PATH_PREFIX
+
+def require_profiling_token(x_profile_token: Optional[str] = Header(default=None)):
+    # Fail closed: no configured token means no access
+    if not settings.PROFILING_TOKEN or not x_profile_token or not secrets.compare_digest(x_profile_token, settings.PROFILING_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Profile-Token")
+
+# Only mounted when PROFILING_TOKEN is set, see profiling.install()
+router = APIRouter(prefix=ADMIN_PATH_PREFIX, tags=["Admin"], dependencies=[Depends(require_profiling_token)])
+
+class ProfileSummary(BaseModel):
+    id: int
+    method: str
+    path: str
+    trigger: str
+    started_at: datetime
+    status_code: Optional[int]
+    duration_ms: Optional[float]
+    samples: int
+    sql_count: int
+    sql_ms: float
+    calls_ms: float
+
+def get_profile_or_404(profile_id: int) -> RequestProfile:
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found (it may have been evicted)")
+    return profile
+
+@router.get("/", response_model=List[ProfileSummary])
+async def list_profiles():
+    """Most recent profiles first."""
+    return [
+        ProfileSummary(
+            **p.model_dump(include={"id", "method", "path", "trigger", "started_at", "status_code", "duration_ms", "samples"}),
+            sql_count=len(p.sql),
+            sql_ms=sum(s.duration_ms for s in p.sql),
+            calls_ms=sum(c.duration_ms for c in p.calls),
+        )
+        for p in reversed(profile_store.list())
+    ]
+
+@router.get("/{profile_id}", response_model=RequestProfile)
+async def get_profile(profile_id: int):
+    return get_profile_or_404(profile_id)
+
+@router.get("/{profile_id}/flamegraph", response_class=PlainTextResponse)
+async def get_profile_flamegraph(profile_id: int):
+    """
+    Folded stacks ("frame;frame;frame count" per line).
+    Render with `flamegraph.pl profile.txt > profile.svg` or load into speedscope.app.
+    """
+    return get_profile_or_404(profile_id).folded()
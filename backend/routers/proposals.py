@@ -1,50 +1,83 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
+from sqlalchemy.orm import selectinload
 from database import get_session
 from models import Proposal, RFP, Vendor
 from services.ai_service import ai_service
+from services.content_store import content_store
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
 import json
 import logging
 
 router = APIRouter(prefix="/proposals", tags=["Proposals"])
 logger = logging.getLogger(__name__)
 
-@router.post("/", response_model=Proposal)
-async def create_proposal(proposal: Proposal, session: Session = Depends(get_session)):
-    logger.info(f"Creating proposal for RFP ID: {proposal.rfp_id}, Vendor ID: {proposal.vendor_id}")
+class ProposalCreateRequest(BaseModel):
+    rfp_id: int
+    vendor_id: int
+    raw_response: str
+
+class ProposalResponse(BaseModel):
+    id: int
+    rfp_id: int
+    vendor_id: int
+    received_at: datetime
+    raw_response: str
+    extracted_data: Optional[str]
+    ai_score: Optional[int]
+    ai_rationale: Optional[str]
+
+@router.post("/", response_model=ProposalResponse)
+async def create_proposal(request: ProposalCreateRequest, session: Session = Depends(get_session)):
+    logger.info(f"Creating proposal for RFP ID: {request.rfp_id}, Vendor ID: {request.vendor_id}")
     # 1. Validate RFP and Vendor exist
-    rfp = session.get(RFP, proposal.rfp_id)
+    rfp = session.get(RFP, request.rfp_id)
     if not rfp:
-        logger.error(f"RFP not found: {proposal.rfp_id}")
+        logger.error(f"RFP not found: {request.rfp_id}")
         raise HTTPException(status_code=404, detail="RFP not found")
         
-    vendor = session.get(Vendor, proposal.vendor_id)
+    vendor = session.get(Vendor, request.vendor_id)
     if not vendor:
-        logger.error(f"Vendor not found: {proposal.vendor_id}")
+        logger.error(f"Vendor not found: {request.vendor_id}")
         raise HTTPException(status_code=404, detail="Vendor not found")
 
 
     # 2. Trigger AI Analysis
     logger.info("Triggering AI analysis for proposal")
-    analysis_result = await ai_service.analyze_proposal(rfp.description, proposal.raw_response)
+    analysis_result = await ai_service.analyze_proposal(rfp.description, request.raw_response)
     logger.info(f"AI analysis completed with score: {analysis_result.get('score')}")
     
-    # 3. Update Proposal with Analysis
-    proposal.ai_score = analysis_result.get("score")
-    proposal.ai_rationale = analysis_result.get("rationale")
-    proposal.extracted_data = json.dumps(analysis_result) # Store full analysis including pros/cons
+    # 3. Store the body compressed (deduplicated) and create the Proposal with Analysis
+    proposal = Proposal(
+        rfp_id=request.rfp_id,
+        vendor_id=request.vendor_id,
+        content=content_store.get_or_create(session, request.raw_response),
+        ai_score=analysis_result.get("score"),
+        ai_rationale=analysis_result.get("rationale"),
+        extracted_data=json.dumps(analysis_result), # Store full analysis including pros/cons
+    )
 
     session.add(proposal)
     session.commit()
     session.refresh(proposal)
-    return proposal
+    return ProposalResponse(**proposal.model_dump(), raw_response=request.raw_response)
 
 @router.get("/rfp/{rfp_id}", response_model=list[Proposal])
 async def list_proposals_for_rfp(rfp_id: int, session: Session = Depends(get_session)):
+    # Bodies are not loaded here; fetch them via GET /proposals/{id}
     statement = select(Proposal).where(Proposal.rfp_id == rfp_id)
     results = session.exec(statement)
     return results.all()
 
+@router.get("/{proposal_id}", response_model=ProposalResponse)
+async def get_proposal(proposal_id: int, session: Session = Depends(get_session)):
+    proposal = session.get(Proposal, proposal_id)
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Proposal not found")
+    return ProposalResponse(**proposal.model_dump(), raw_response=proposal.raw_response)
+
 @router.post("/compare/{rfp_id}")
 async def compare_proposals_endpoint(rfp_id: int, session: Session = Depends(get_session)):
     logger.info(f"Starting proposal comparison for RFP ID: {rfp_id}")
@@ -54,8 +87,8 @@ async def compare_proposals_endpoint(rfp_id: int, session: Session = Depends(get
         logger.error(f"RFP not found for comparison: {rfp_id}")
         raise HTTPException(status_code=404, detail="RFP not found")
         
-    # 2. Fetch all proposals for this RFP
-    statement = select(Proposal).where(Proposal.rfp_id == rfp_id)
+    # 2. Fetch all proposals for this RFP (bodies in one extra query, not one per proposal)
+    statement = select(Proposal).where(Proposal.rfp_id == rfp_id).options(selectinload(Proposal.content))
     proposals = session.exec(statement).all()
     
     if not proposals:
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlmodel import Session, select
+from sqlalchemy.exc import IntegrityError
 from database import get_session
 from models import Vendor
+from services.vendor_import import vendor_import_service, VendorImportResult
 from typing import List
 
 router = APIRouter(prefix="/vendors", tags=["Vendors"])
@@ -9,10 +11,28 @@ router = APIRouter(prefix="/vendors", tags=["Vendors"])
 @router.post("/", response_model=Vendor)
 async def create_vendor(vendor: Vendor, session: Session = Depends(get_session)):
     session.add(vendor)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="A vendor with this email already exists")
     session.refresh(vendor)
     return vendor
 
+@router.post("/import", response_model=VendorImportResult)
+def import_vendors(file: UploadFile = File(...), session: Session = Depends(get_session)):
+    """
+    Bulk insert/update vendors from a CSV or XLSX upload (columns: name, email, contact_person).
+    Existing vendors are matched on email and updated.
+    Sync handler on purpose: parsing and the batched upserts are blocking work,
+    so FastAPI runs this in its threadpool instead of on the event loop.
+    """
+    try:
+        return vendor_import_service.import_file(session, file.file, file.filename or "")
+    except ValueError as e:
+        session.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/", response_model=List[Vendor])
 async def list_vendors(session: Session = Depends(get_session)):
     statement = select(Vendor)
@@ -1,21 +1,122 @@
 from google import genai
 from google.genai import types
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 import json
 import asyncio
 
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional
 from config import settings
+from profiling import traced
 import logging
 
 logger = logging.getLogger(__name__)
 
+MODEL = 'gemini-2.5-flash-lite'
+RETRY_COUNT = 3
+
 class AIService:
     def __init__(self):
-        if settings.GOOGLE_API_KEY:
-            self.client = genai.Client(api_key=settings.GOOGLE_API_KEY)
-        else:
-            self.client = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[genai.Client] = None
+
+    @property
+    def client(self) -> Optional[genai.Client]:
+        """
+        The Gemini client, built on first use and again after aclose(), so the
+        service keeps working if the app's lifespan runs more than once.
+        """
+        if self._client is None and settings.GOOGLE_API_KEY:
+            # One pooled HTTP client shared by every call made through client.aio
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.AI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.AI_MAX_CONNECTIONS,
+                ),
+            )
+            self._client = genai.Client(
+                api_key=settings.GOOGLE_API_KEY,
+                http_options=types.HttpOptions(
+                    timeout=int(settings.AI_REQUEST_TIMEOUT_S * 1000), # milliseconds
+                    httpx_async_client=self._http_client,
+                ),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._http_client = None
+        self._client = None
+        self._executor = None
+
+    async def _stream_text(self, prompt: str) -> str:
+        """Sends the prompt and returns the concatenated streamed response text."""
+        contents = [
+            types.Content(
+                role="user",
+                parts=[types.Part.from_text(text=prompt)]
+            )
+        ]
+        config = types.GenerateContentConfig(response_mime_type='application/json')
+
+        if not settings.AI_USE_SYNC_CLIENT:
+            chunks = []
+            async for chunk in await self.client.aio.models.generate_content_stream(
+                model=MODEL, contents=contents, config=config
+            ):
+                if chunk.text:
+                    chunks.append(chunk.text)
+            return "".join(chunks)
+
+        # Blocking fallback on its own executor so it can't starve the default one
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=settings.AI_SYNC_WORKERS, thread_name_prefix="ai-sync")
+
+        def generate_content():
+            chunks = []
+            for chunk in self.client.models.generate_content_stream(model=MODEL, contents=contents, config=config):
+                if chunk.text:
+                    chunks.append(chunk.text)
+            return "".join(chunks)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, generate_content)
+
+    async def _generate_json(self, prompt: str, task: str, on_error: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Request pipeline shared by all AI calls: prompt -> stream -> parse JSON,
+        retrying on rate limits (429). Returns on_error(error) if the call fails.
+        """
+        for attempt in range(RETRY_COUNT):
+            try:
+                raw_text = await self._stream_text(prompt)
+                logger.info(f"{task} response (attempt {attempt+1}): {raw_text[:100]}...")
+                
+                # Extract JSON from the text
+                json_start = raw_text.find('{')
+                json_end = raw_text.rfind('}') + 1
+                if json_start != -1 and json_end != 0:
+                    clean_json_text = raw_text[json_start:json_end]
+                else:
+                    clean_json_text = raw_text.strip()
+                
+                return json.loads(clean_json_text)
+
+            except Exception as e:
+                error_str = str(e)
+                if "429" in error_str and attempt < RETRY_COUNT - 1:
+                    wait_time = (attempt + 1) * 2
+                    logger.warning(f"Rate limit hit in {task}. Retrying in {wait_time}s...")
+                    await asyncio.sleep(wait_time)
+                else:
+                    logger.error(f"AI {task} Error: {error_str}")
+                    return on_error(error_str)
 
+    @traced("ai.extract_rfp_structure")
     async def extract_rfp_structure(self, natural_language_input: str) -> Dict[str, Any]:
         """
         Extracts structured RFP data from natural language text using Gemini.
@@ -53,61 +154,19 @@ class AIService:
         }}
         """
         
-        retry_count = 3
-        
-        for attempt in range(retry_count):
-            try:
-                contents = [
-                    types.Content(
-                        role="user",
-                        parts=[types.Part.from_text(text=prompt)]
-                    )
-                ]
-                
-                def generate_content():
-                    response_text = ""
-                    for chunk in self.client.models.generate_content_stream(
-                        model='gemini-2.5-flash-lite',
-                        contents=contents,
-                        config=types.GenerateContentConfig(
-                            response_mime_type='application/json'
-                        )
-                    ):
-                        if hasattr(chunk, 'text') and chunk.text:
-                            response_text += chunk.text
-                    return response_text
-
-                loop = asyncio.get_event_loop()
-                raw_text = await loop.run_in_executor(None, generate_content)
-                logger.info(f"AI response (attempt {attempt+1}): {raw_text[:100]}...")
-                
-                # Extract JSON from the text
-                json_start = raw_text.find('{')
-                json_end = raw_text.rfind('}') + 1
-                if json_start != -1 and json_end != 0:
-                    clean_json_text = raw_text[json_start:json_end]
-                else:
-                    clean_json_text = raw_text.strip()
-                
-                return json.loads(clean_json_text)
+        def on_error(error_str: str) -> Dict[str, Any]:
+            title_fallback = (natural_language_input[:40] + "...") if len(natural_language_input) > 40 else natural_language_input
+            return {
+                "title": f"[AI Error] {title_fallback}",
+                "description": f"AI extraction failed: {error_str}\n\nOriginal Text: {natural_language_input}",
+                "budget": None,
+                "currency": "USD",
+                "error": error_str
+            }
 
-            except Exception as e:
-                error_str = str(e)
-                if "429" in error_str and attempt < retry_count - 1:
-                    wait_time = (attempt + 1) * 2
-                    logger.warning(f"Rate limit hit. Retrying in {wait_time}s...")
-                    await asyncio.sleep(wait_time)
-                else:
-                    logger.error(f"AI Extraction Error: {error_str}")
-                    title_fallback = (natural_language_input[:40] + "...") if len(natural_language_input) > 40 else natural_language_input
-                    return {
-                        "title": f"[AI Error] {title_fallback}",
-                        "description": f"AI extraction failed: {error_str}\n\nOriginal Text: {natural_language_input}",
-                        "budget": None,
-                        "currency": "USD",
-                        "error": error_str
-                    }
+        return await self._generate_json(prompt, "Extraction", on_error)
 
+    @traced("ai.analyze_proposal")
     async def analyze_proposal(self, rfp_context: str, proposal_text: str) -> Dict[str, Any]:
         """
         Analyzes a vendor proposal against the RFP context.
@@ -142,63 +201,19 @@ class AIService:
         JSON:
         """
         
-        retry_count = 3
-        
-        for attempt in range(retry_count):
-            try:
-                contents = [
-                    types.Content(
-                        role="user",
-                        parts=[types.Part.from_text(text=prompt)]
-                    )
-                ]
-                
-                def generate_content():
-                    response_text = ""
-                    for chunk in self.client.models.generate_content_stream(
-                        model='gemini-2.5-flash-lite',
-                        contents=contents,
-                        config=types.GenerateContentConfig(
-                            response_mime_type='application/json'
-                        )
-                    ):
-                        if hasattr(chunk, 'text') and chunk.text:
-                            response_text += chunk.text
-                    return response_text
-
-                loop = asyncio.get_event_loop()
-                raw_text = await loop.run_in_executor(None, generate_content)
-                logger.info(f"Proposal Analysis response (attempt {attempt+1}): {raw_text[:100]}...")
-                
-                # Extract JSON from the text
-                json_start = raw_text.find('{')
-                json_end = raw_text.rfind('}') + 1
-                if json_start != -1 and json_end != 0:
-                    clean_json_text = raw_text[json_start:json_end]
-                else:
-                    clean_json_text = raw_text.strip()
-                
-                return json.loads(clean_json_text)
-
-            except Exception as e:
-                error_str = str(e)
-                if "429" in error_str and attempt < retry_count - 1:
-                    wait_time = (attempt + 1) * 2
-                    logger.warning(f"Rate limit hit in analysis. Retrying in {wait_time}s...")
-                    await asyncio.sleep(wait_time)
-                else:
-                    logger.error(f"AI Analysis Error: {error_str}")
-                    return {
-                        "score": 0,
-                        "rationale": f"Analysis failed: {error_str}",
-                        "extracted_price": 0,
-                        "pros": [],
-                        "cons": [],
-                        "error": error_str
-                    }
-
+        def on_error(error_str: str) -> Dict[str, Any]:
+            return {
+                "score": 0,
+                "rationale": f"Analysis failed: {error_str}",
+                "extracted_price": 0,
+                "pros": [],
+                "cons": [],
+                "error": error_str
+            }
 
+        return await self._generate_json(prompt, "Analysis", on_error)
 
+    @traced("ai.compare_proposals")
     async def compare_proposals(self, rfp_context: str, proposals_list: list[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Compares multiple vendor proposals against the RFP.
@@ -237,57 +252,14 @@ class AIService:
         JSON:
         """
         
-        retry_count = 3
-        
-        for attempt in range(retry_count):
-            try:
-                contents = [
-                    types.Content(
-                        role="user",
-                        parts=[types.Part.from_text(text=prompt)]
-                    )
-                ]
-                
-                def generate_content():
-                    response_text = ""
-                    for chunk in self.client.models.generate_content_stream(
-                        model='gemini-2.5-flash-lite',
-                        contents=contents,
-                        config=types.GenerateContentConfig(
-                            response_mime_type='application/json'
-                        )
-                    ):
-                        if hasattr(chunk, 'text') and chunk.text:
-                            response_text += chunk.text
-                    return response_text
-
-                loop = asyncio.get_event_loop()
-                raw_text = await loop.run_in_executor(None, generate_content)
-                logger.info(f"Comparison response (attempt {attempt+1}): {raw_text[:100]}...")
-                
-                # Extract JSON from the text
-                json_start = raw_text.find('{')
-                json_end = raw_text.rfind('}') + 1
-                if json_start != -1 and json_end != 0:
-                    clean_json_text = raw_text[json_start:json_end]
-                else:
-                    clean_json_text = raw_text.strip()
-                
-                return json.loads(clean_json_text)
+        def on_error(error_str: str) -> Dict[str, Any]:
+            return {
+                "recommendation": f"Comparison failed: {error_str}",
+                "comparison_matrix": [],
+                "best_vendor_id": None
+            }
 
-            except Exception as e:
-                error_str = str(e)
-                if "429" in error_str and attempt < retry_count - 1:
-                    wait_time = (attempt + 1) * 2
-                    logger.warning(f"Rate limit hit in comparison. Retrying in {wait_time}s...")
-                    await asyncio.sleep(wait_time)
-                else:
-                    logger.error(f"AI Comparison Error: {error_str}")
-                    return {
-                        "recommendation": f"Comparison failed: {error_str}",
-                        "comparison_matrix": [],
-                        "best_vendor_id": None
-                    }
+        return await self._generate_json(prompt, "Comparison", on_error)
 
 ai_service = AIService()
 
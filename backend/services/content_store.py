@@ -0,0 +1,47 @@
+from sqlmodel import Session, select
+from sqlalchemy.dialects import postgresql, sqlite
+from models import ProposalContent
+from compression import content_hash
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ContentStore:
+    def get_or_create(self, session: Session, text: str) -> ProposalContent:
+        """
+        Returns the stored content row for `text`, compressing and inserting a new
+        one only if no identical body has been stored before.
+        The insert runs in the session's transaction but is not committed.
+        """
+        digest = content_hash(text)
+        existing = self._get(session, digest)
+        if existing:
+            logger.info(f"Reusing stored content {existing.id} for hash {digest[:12]}")
+            return existing
+
+        content = ProposalContent.from_text(text)
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement = postgresql.insert(ProposalContent)
+        elif dialect == "sqlite":
+            statement = sqlite.insert(ProposalContent)
+        else:
+            raise ValueError(f"Content store is not supported for database dialect: {dialect}")
+        # A concurrent request may store the same body between the lookup and
+        # here; DO NOTHING on the unique hash and read back whichever row won
+        session.execute(
+            statement.values(content.model_dump(exclude={"id"})).on_conflict_do_nothing(
+                index_elements=[ProposalContent.content_hash]
+            )
+        )
+        stored = self._get(session, digest)
+        logger.info(f"Stored content {stored.id}: {stored.size} bytes -> {len(stored.data)} bytes ({stored.codec})")
+        return stored
+
+    def _get(self, session: Session, digest: str) -> Optional[ProposalContent]:
+        return session.exec(
+            select(ProposalContent).where(ProposalContent.content_hash == digest)
+        ).first()
+
+content_store = ContentStore()
@@ -3,8 +3,10 @@ import aiosmtplib
 from email.message import EmailMessage
 from typing import List
 from config import settings
+from profiling import traced
 
 class EmailService:
+    @traced("email.send_email")
     async def send_email(self, to_email: str, subject: str, body: str):
         if not settings.EMAIL_ADDRESS or not settings.EMAIL_PASSWORD:
             print("WARNING: Email credentials not set in settings. Skipping email send.")
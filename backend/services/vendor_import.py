@@ -0,0 +1,162 @@
+from sqlmodel import Session, select
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from models import Vendor
+from profiling import traced
+from pydantic import BaseModel
+from typing import BinaryIO, Iterator, List, Optional
+import csv
+import io
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+class VendorImportError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    reason: str
+
+class VendorImportResult(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    rejected: int = 0
+    duplicates: int = 0 # Rows superseded by a later row with the same email
+    errors: List[VendorImportError] = [] # Capped at MAX_REPORTED_ERRORS
+
+class VendorImportService:
+    @traced("vendor_import.import_file")
+    def import_file(self, session: Session, file: BinaryIO, filename: str) -> VendorImportResult:
+        """
+        Streams a CSV or XLSX supplier list and upserts it on Vendor.email.
+        Expected header columns: name, email, contact_person (optional).
+        Existing vendors keep their contact_person if the column is missing
+        or the cell is blank.
+        Rows are validated and written in chunks of CHUNK_SIZE, one batched
+        INSERT ... ON CONFLICT statement per chunk, committed once at the end.
+        """
+        if filename.lower().endswith(".xlsx"):
+            rows = self._iter_xlsx(file)
+        elif filename.lower().endswith(".csv"):
+            rows = self._iter_csv(file)
+        else:
+            raise ValueError("Unsupported file type, expected .csv or .xlsx")
+
+        result = VendorImportResult()
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("File is empty")
+        columns = [str(h or "").strip().lower() for h in header]
+        missing = {"name", "email"} - set(columns)
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(sorted(missing))}")
+        has_contact_person = "contact_person" in columns
+
+        chunk: dict[str, tuple[int, dict]] = {} # email -> (row number, vendor)
+        for row_number, values in enumerate(rows, start=2): # Row 1 is the header
+            # Blank lines / trailing empty spreadsheet rows are not rejections
+            if all(v is None or str(v).strip() == "" for v in values):
+                continue
+            record = dict(zip(columns, values))
+            vendor, reason = self._validate(record)
+            if reason:
+                self._reject(result, row_number, vendor["email"] or None, reason)
+                continue
+            # Later rows for the same email win; a single ON CONFLICT statement
+            # cannot touch the same row twice
+            if vendor["email"] in chunk:
+                superseded_row, _ = chunk[vendor["email"]]
+                result.duplicates += 1
+                self._report(result, superseded_row, vendor["email"], f"Duplicate email, superseded by row {row_number}")
+            chunk[vendor["email"]] = (row_number, vendor)
+            if len(chunk) >= CHUNK_SIZE:
+                self._upsert_chunk(session, [v for _, v in chunk.values()], result, has_contact_person)
+                chunk = {}
+        if chunk:
+            self._upsert_chunk(session, [v for _, v in chunk.values()], result, has_contact_person)
+
+        session.commit()
+        logger.info(
+            f"Vendor import finished: {result.inserted} inserted, {result.updated} updated, "
+            f"{result.rejected} rejected, {result.duplicates} duplicates"
+        )
+        return result
+
+    def _iter_csv(self, file: BinaryIO) -> Iterator[list]:
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        try:
+            yield from csv.reader(text)
+        except csv.Error as e:
+            raise ValueError(f"Could not parse CSV file: {e}")
+        finally:
+            text.detach() # Leave the underlying upload file open for its owner
+
+    def _iter_xlsx(self, file: BinaryIO) -> Iterator[list]:
+        import openpyxl
+
+        try:
+            workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        except Exception as e:
+            raise ValueError(f"Could not read XLSX file: {e}")
+        try:
+            for values in workbook.active.iter_rows(values_only=True):
+                yield list(values)
+        finally:
+            workbook.close()
+
+    def _validate(self, record: dict) -> tuple[dict, Optional[str]]:
+        """
+        Returns the row normalized to strings (XLSX cells may be numbers, dates...)
+        and the rejection reason, or None if the row is valid.
+        """
+        vendor = {
+            "name": self._cell(record.get("name")) or "",
+            "email": self._cell(record.get("email")) or "",
+            "contact_person": self._cell(record.get("contact_person")),
+        }
+        if not vendor["name"]:
+            return vendor, "Missing name"
+        if not EMAIL_RE.match(vendor["email"]):
+            return vendor, "Invalid email"
+        return vendor, None
+
+    def _cell(self, value) -> Optional[str]:
+        if value is None:
+            return None
+        return str(value).strip() or None
+
+    def _reject(self, result: VendorImportResult, row: int, email: Optional[str], reason: str):
+        result.rejected += 1
+        self._report(result, row, email, reason)
+
+    def _report(self, result: VendorImportResult, row: int, email: Optional[str], reason: str):
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append(VendorImportError(row=row, email=email, reason=reason))
+
+    def _upsert_chunk(self, session: Session, vendors: list[dict], result: VendorImportResult, has_contact_person: bool):
+        emails = [v["email"] for v in vendors]
+        existing = len(session.exec(select(Vendor.email).where(Vendor.email.in_(emails))).all())
+
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement = postgresql.insert(Vendor)
+        elif dialect == "sqlite":
+            statement = sqlite.insert(Vendor)
+        else:
+            raise ValueError(f"Bulk upsert is not supported for database dialect: {dialect}")
+        set_ = {"name": statement.excluded.name}
+        if has_contact_person:
+            # A blank cell keeps the stored contact instead of clearing it
+            set_["contact_person"] = func.coalesce(statement.excluded.contact_person, Vendor.contact_person)
+        statement = statement.on_conflict_do_update(index_elements=[Vendor.email], set_=set_)
+        # executemany: the driver batches the rows into multi-row statements
+        session.execute(statement, vendors)
+
+        result.inserted += len(vendors) - existing
+        result.updated += existing
+
+vendor_import_service = VendorImportService()